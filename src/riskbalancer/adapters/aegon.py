@@ -7,8 +7,7 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import csv
-from pathlib import Path
-from typing import Iterable, Mapping, Optional, Sequence, TextIO, Union
+from typing import Iterable, Iterator, Optional, Sequence, TextIO
 
 from ..models import Investment
 from .base import StatementAdapter
@@ -24,31 +23,32 @@ class AegonCSVAdapter(StatementAdapter):
 
     source_name = "Aegon CSV"
 
-    def parse_path(self, path: Union[str, Path]) -> Sequence[Investment]:
-        # ``utf-8-sig`` matches the other CSV adapters and tolerates a BOM
-        # if the export was produced on Windows.
-        with open(path, "r", encoding="utf-8-sig") as handle:
-            return self.parse_file(handle)
-
-    def parse_file(self, handle: TextIO) -> Sequence[Investment]:
-        reader = csv.DictReader(handle)
-        investments: list[Investment] = []
-        for row in reader:
-            investment = self._row_to_investment(row)
-            if investment:
-                investments.append(investment)
-        return investments
-
-    def parse_rows(self, rows: Iterable[dict[str, str]]) -> Sequence[Investment]:
-        investments: list[Investment] = []
-        for row in rows:
-            investment = self._row_to_investment(row)
+    # ``utf-8-sig`` matches the other CSV adapters and tolerates a BOM
+    # if the export was produced on Windows.
+    encoding = "utf-8-sig"
+
+    def iter_file(self, handle: TextIO) -> Iterator[Investment]:
+        return self._iter_rows(csv.reader(handle))
+
+    def _iter_rows(self, rows: Iterable[Sequence[str]]) -> Iterator[Investment]:
+        iterator = iter(rows)
+        header = next(iterator, None)
+        if header is None:
+            return
+        name_index = self._column_index(header, "Investment")
+        value_index = self._column_index(header, "Value")
+        for row in iterator:
+            investment = self._row_to_investment(row, name_index, value_index)
             if investment:
-                investments.append(investment)
-        return investments
-
-    def _row_to_investment(self, row: Mapping[str, str]) -> Optional[Investment]:
-        name = (row.get("Investment") or "").strip()
+                yield investment
+
+    def _row_to_investment(
+        self,
+        row: Sequence[str],
+        name_index: Optional[int],
+        value_index: Optional[int],
+    ) -> Optional[Investment]:
+        name = self._cell(row, name_index).strip()
         if not name:
             return None
         # Aegon emits a per-section ``TOTAL`` row with a blank ``Value``.
@@ -56,11 +56,11 @@ class AegonCSVAdapter(StatementAdapter):
         if name.upper() == "TOTAL":
             return None
 
-        value_raw = row.get("Value")
+        value_raw = self._cell(row, value_index)
         if not value_raw:
             return None
 
-        market_value = self._parse_number(value_raw)
+        market_value = self._parse_amount(value_raw)
         if market_value == 0:
             return None
 
@@ -71,11 +71,3 @@ class AegonCSVAdapter(StatementAdapter):
             currency="GBP",
             source="aegon",
         )
-
-    @staticmethod
-    def _parse_number(value: str) -> float:
-        sanitized = value.replace(",", "").replace("£", "").replace("Â", "").strip()
-        sanitized = sanitized.replace("%", "")
-        if not sanitized:
-            return 0.0
-        return float(sanitized)
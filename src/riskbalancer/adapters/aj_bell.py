@@ -10,47 +10,62 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import csv
-from pathlib import Path
-from typing import Iterable, Mapping, Optional, Sequence, TextIO, Union
+from typing import Iterable, Iterator, Optional, Sequence, TextIO
 
 from ..models import Investment
 from .base import StatementAdapter
 
+# AJ Bell has shipped the value column under several spellings, including
+# the `Â£` mojibake Excel produces when a UTF-8 export is re-saved. These
+# are the only headers matched case-insensitively.
+VALUE_COLUMNS = ("Value (£)", "Value (Â£)", "Value (£ )", "Value")
+
 
 class AJBellCSVAdapter(StatementAdapter):
     """Adapter that parses AJ Bell CSV statements."""
 
     source_name = "AJ Bell CSV"
-
-    def parse_path(self, path: Union[str, Path]) -> Sequence[Investment]:
-        with open(path, "r", encoding="utf-8-sig") as handle:
-            return self.parse_file(handle)
-
-    def parse_file(self, handle: TextIO) -> Sequence[Investment]:
-        reader = csv.DictReader(handle)
-        investments: list[Investment] = []
-        for row in reader:
-            investment = self._row_to_investment(row)
-            if investment:
-                investments.append(investment)
-        return investments
-
-    def parse_rows(self, rows: Iterable[dict[str, str]]) -> Sequence[Investment]:
-        investments: list[Investment] = []
-        for row in rows:
-            investment = self._row_to_investment(row)
+    encoding = "utf-8-sig"
+
+    def iter_file(self, handle: TextIO) -> Iterator[Investment]:
+        return self._iter_rows(csv.reader(handle))
+
+    def _iter_rows(self, rows: Iterable[Sequence[str]]) -> Iterator[Investment]:
+        iterator = iter(rows)
+        header = next(iterator, None)
+        if header is None:
+            return
+        name_index = self._column_index(header, "Investment")
+        value_index = self._column_index(header, *VALUE_COLUMNS, ignore_case=True)
+        ticker_index = self._column_index(header, "Ticker")
+        symbol_index = self._column_index(header, "Symbol")
+        for row in iterator:
+            investment = self._row_to_investment(
+                row,
+                name_index=name_index,
+                value_index=value_index,
+                ticker_index=ticker_index,
+                symbol_index=symbol_index,
+            )
             if investment:
-                investments.append(investment)
-        return investments
-
-    def _row_to_investment(self, row: Mapping[str, str]) -> Optional[Investment]:
-        name = row.get("Investment")
-        value_raw = self._get_first(row, ["Value (£)", "Value (Â£)", "Value (£ )", "Value"])
-        ticker = row.get("Ticker") or row.get("Symbol")
+                yield investment
+
+    def _row_to_investment(
+        self,
+        row: Sequence[str],
+        *,
+        name_index: Optional[int],
+        value_index: Optional[int],
+        ticker_index: Optional[int],
+        symbol_index: Optional[int],
+    ) -> Optional[Investment]:
+        name = self._cell(row, name_index)
+        value_raw = self._cell(row, value_index)
+        ticker = self._cell(row, ticker_index) or self._cell(row, symbol_index)
         if not name or not value_raw:
             return None
 
-        market_value = self._parse_number(value_raw)
+        market_value = self._parse_amount(value_raw)
         if market_value == 0:
             return None
 
@@ -61,24 +76,3 @@ class AJBellCSVAdapter(StatementAdapter):
             currency="GBP",
             source="aj_bell",
         )
-
-    @staticmethod
-    def _parse_number(value: str) -> float:
-        sanitized = value.replace(",", "").replace("£", "").replace("Â", "").strip()
-        sanitized = sanitized.replace("%", "")
-        if not sanitized:
-            return 0.0
-        return float(sanitized)
-
-    @staticmethod
-    def _get_first(row: Mapping[str, str], keys: Sequence[str]) -> Optional[str]:
-        for key in keys:
-            if key in row:
-                return row[key]
-        # attempt case-insensitive fallback
-        lowered = {k.lower(): v for k, v in row.items()}
-        for key in keys:
-            normalized = key.lower()
-            if normalized in lowered:
-                return lowered[normalized]
-        return None
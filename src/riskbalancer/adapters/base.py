@@ -7,30 +7,100 @@ Author: Emre Tezel
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Sequence, TextIO, Union
+from typing import Iterator, Optional, Sequence, TextIO, Union
 
 from ..models import Investment
 
+# Characters dropped from money cells before `float()`: thousands separators,
+# currency symbols (plus the `Â` mojibake that precedes `£` in re-saved
+# Windows exports) and stray percent signs. Built once so `_parse_amount`
+# strips them in a single `str.translate` pass instead of chaining one
+# `str.replace` (and one intermediate string) per character.
+_AMOUNT_NOISE = str.maketrans("", "", ",$£Â%")
+
 
 class StatementAdapter(ABC):
     """Base class for broker statement ingestion.
 
     Subclasses set `source_name` as a class attribute (or in their own
-    `__init__`) and implement `parse_file` to produce a sequence of
-    `Investment` rows in the position's native currency.
+    `__init__`) and implement `iter_file` to lazily yield `Investment`
+    rows in the position's native currency; `parse_file` / `parse_path`
+    collect them into a list.
+
+    Exports that wrap the holdings table in an account preamble and a
+    footer (Citi, Schwab) skip ahead to the table's header row, then drop
+    any row whose width differs from the header's, which discards blank
+    lines and footer rows.
     """
 
     source_name: str = "unknown"
+    # Encoding `parse_path` opens statements with. Broker exports produced
+    # on Windows often carry a BOM, so most adapters use ``utf-8-sig``.
+    encoding: str = "utf-8"
+
+    def parse_path(
+        self, path: Union[str, Path], *, max_rows: Optional[int] = None
+    ) -> Sequence[Investment]:
+        with open(path, "r", encoding=self.encoding) as handle:
+            return self.parse_file(handle, max_rows=max_rows)
+
+    def parse_file(self, handle: TextIO, *, max_rows: Optional[int] = None) -> Sequence[Investment]:
+        """Return normalized investments found in the file.
 
-    def parse_path(self, path: Union[str, Path]) -> Sequence[Investment]:
-        with open(path, "r", encoding="utf-8") as handle:
-            return self.parse_file(handle)
+        `max_rows` caps how many investments are returned (preview /
+        sampling). Because `iter_file` is lazy, parsing stops as soon as
+        the cap is reached and the rest of the file is never converted.
+        """
+        return list(islice(self.iter_file(handle), max_rows))
 
     @abstractmethod
-    def parse_file(self, handle: TextIO) -> Sequence[Investment]:
-        """Return normalized investments found in the file."""
+    def iter_file(self, handle: TextIO) -> Iterator[Investment]:
+        """Yield normalized investments found in the file, in file order."""
+
+    @staticmethod
+    def _column_index(
+        header: Sequence[str], *candidates: str, ignore_case: bool = False
+    ) -> Optional[int]:
+        """Return the index of the first candidate column present in `header`.
+
+        Adapters read rows as plain lists from `csv.reader`, resolve the
+        columns they need once from the header and then index each row
+        directly, rather than paying for a `csv.DictReader` dict per row.
+        Matching is exact unless `ignore_case` is set, in which case a
+        second, case-insensitive pass runs when no candidate matches exactly.
+        """
+        for candidate in candidates:
+            if candidate in header:
+                return header.index(candidate)
+        if ignore_case:
+            lowered = [column.lower() for column in header]
+            for candidate in candidates:
+                if candidate.lower() in lowered:
+                    return lowered.index(candidate.lower())
+        return None
+
+    @staticmethod
+    def _cell(row: Sequence[str], index: Optional[int]) -> str:
+        """Return `row[index]`, or "" when the column is absent or the row is short."""
+        if index is None or index >= len(row):
+            return ""
+        return row[index]
+
+    @staticmethod
+    def _parse_amount(value: Optional[str]) -> float:
+        """Parse a broker money cell into a float in the cell's own currency.
 
-    def parse_rows(self, rows: Iterable[dict[str, str]]) -> Sequence[Investment]:
-        """Optional helper for csv.DictReader driven adapters."""
-        raise NotImplementedError
+        Every adapter funnels its market-value column through this one helper
+        so there is a single hot path to tune. Thousands separators, currency
+        symbols (`$`, `£` and the `Â` mojibake that Windows exports prepend
+        to it) and a stray `%` are dropped; blank cells read as zero so the
+        caller's "skip zero-value rows" check handles them.
+        """
+        if not value:
+            return 0.0
+        sanitized = value.translate(_AMOUNT_NOISE).strip()
+        if not sanitized:
+            return 0.0
+        return float(sanitized)
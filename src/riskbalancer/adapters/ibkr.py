@@ -12,8 +12,7 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import csv
-from pathlib import Path
-from typing import Optional, Sequence, TextIO, Union
+from typing import Iterator, Optional, Sequence, TextIO
 
 from ..models import Investment
 from .base import StatementAdapter
@@ -23,49 +22,68 @@ class IBKRCSVAdapter(StatementAdapter):
     """Adapter that parses Interactive Brokers MTM CSV exports."""
 
     source_name = "Interactive Brokers CSV"
+    encoding = "utf-8-sig"
 
-    def parse_path(self, path: Union[str, Path]) -> Sequence[Investment]:
-        with open(path, "r", encoding="utf-8-sig") as handle:
-            return self.parse_file(handle)
+    POSITIONS_SECTION = "Positions and Mark-to-Market Profit and Loss"
+    # Fixed column layout of the Positions section (see the section's
+    # ``Header`` row): Section, Header/Data, DataDiscriminator, Asset Class,
+    # Currency, Symbol, Description, …, Market Value (12), …, Total (17).
+    DISCRIMINATOR_COLUMN = 2
+    CURRENCY_COLUMN = 4
+    SYMBOL_COLUMN = 5
+    DESCRIPTION_COLUMN = 6
+    MARKET_VALUE_COLUMN = 12
+    ROW_WIDTH = 18
+    # Raw-line starts of a Positions record, bare or with a quoted section.
+    _POSITIONS_PREFIXES = (POSITIONS_SECTION, f'"{POSITIONS_SECTION}"')
 
-    def parse_file(self, handle: TextIO) -> Sequence[Investment]:
-        reader = csv.reader(handle)
+    def iter_file(self, handle: TextIO) -> Iterator[Investment]:
+        # The MTM export interleaves many sections, and only the Positions
+        # rows matter. A raw-line prefix check rejects every other record
+        # before it is tokenised, so `csv.reader` only ever sees Positions
+        # records. A quoted field may span lines; an odd number of `"` on a
+        # line opens or closes one, and its continuation lines follow the
+        # keep/skip decision of the line that started the record.
         in_positions = False
-        investments: list[Investment] = []
-        rows = list(reader)
-        idx = 0
-
-        while idx < len(rows):
-            row = rows[idx]
-            section = row[0] if row else ""
-            if section == "Positions and Mark-to-Market Profit and Loss":
-                kind = row[1]
-                if kind == "Header":
-                    in_positions = True
-                    idx += 1
-                    continue
-                if in_positions and kind == "Data":
-                    data = row
-                    entry = self._parse_position_row(data)
-                    if entry:
-                        investments.append(entry)
-            else:
+        keep = False
+        open_quote = False
+        record: list[str] = []
+        for line in handle:
+            if not open_quote:
+                keep = line.startswith(self._POSITIONS_PREFIXES)
+                if not keep:
+                    in_positions = False
+            if line.count('"') % 2:
+                open_quote = not open_quote
+            if not keep:
+                continue
+            record.append(line)
+            if open_quote:
+                continue
+            row = next(csv.reader(record), [])
+            record = []
+            if not row or row[0] != self.POSITIONS_SECTION:
                 in_positions = False
-            idx += 1
-        return investments
+                continue
+            kind = row[1] if len(row) > 1 else ""
+            if kind == "Header":
+                in_positions = True
+            elif in_positions and kind == "Data":
+                entry = self._parse_position_row(row)
+                if entry:
+                    yield entry
 
     def _parse_position_row(self, row: Sequence[str]) -> Optional[Investment]:
-        if len(row) < 18:
+        # One width check covers every column read below; only the
+        # per-symbol ``Summary`` rows carry a position (lot rows do not).
+        if len(row) < self.ROW_WIDTH or row[self.DISCRIMINATOR_COLUMN] != "Summary":
             return None
-        discriminator = row[2]
-        currency = (row[4] or "").strip().upper() or "GBP"
-        symbol = (row[5] or "").strip()
-        description = (row[6] or "").strip()
+        symbol = row[self.SYMBOL_COLUMN].strip()
+        description = row[self.DESCRIPTION_COLUMN].strip()
         if not symbol or not description:
             return None
-        if discriminator != "Summary":
-            return None
-        market_value = self._parse_number(row[12])
+        currency = row[self.CURRENCY_COLUMN].strip().upper() or "GBP"
+        market_value = self._parse_amount(row[self.MARKET_VALUE_COLUMN])
         return Investment(
             instrument_id=symbol or description,
             description=description or symbol,
@@ -73,10 +91,3 @@ class IBKRCSVAdapter(StatementAdapter):
             currency=currency,
             source="ibkr",
         )
-
-    @staticmethod
-    def _parse_number(value: str) -> float:
-        sanitized = value.replace(",", "").strip()
-        if not sanitized:
-            return 0.0
-        return float(sanitized)
@@ -18,13 +18,11 @@ import csv
 import shutil
 import sqlite3
 import sys
-import urllib.error
-import urllib.request
 import xml.etree.ElementTree as ET
 from collections import defaultdict
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO
 
 from . import repositories
 from .adapters import (
@@ -43,6 +41,7 @@ from .configuration import (
     format_category_weight_validation_failures,
 )
 from .db import Database
+from .models import Investment, parse_category_label
 from .paths import UserPaths
 from .plan_adjust import (
     apply_targeted,
@@ -112,10 +111,6 @@ def _ingestion_now() -> datetime:
     return datetime.now(UTC)
 
 
-def _utc_timestamp() -> str:
-    return _ingestion_now().isoformat().replace("+00:00", "Z")
-
-
 def _today_iso() -> str:
     return _ingestion_now().strftime("%Y-%m-%d")
 
@@ -140,9 +135,8 @@ def _autofile_statement(
     returned as-is (the user pre-filed it manually). Otherwise the source
     is copied (or moved when `move=True`) into a year/month folder named
     after the current ingestion date, with a numeric suffix appended on
-    filename conflict.
+    filename conflict. `source` must already be resolved.
     """
-    source = source.resolve()
     statements_root = paths.statements_dir.resolve()
     try:
         source.relative_to(statements_root)
@@ -182,7 +176,7 @@ def build_adapter(name: str) -> StatementAdapter:
     return cls()
 
 
-def parse_statement(statement_path: Path, adapter_name: str):
+def parse_statement(statement_path: Path, adapter_name: str) -> Sequence[Investment]:
     """Parse a broker statement at `statement_path` using the named adapter."""
     return build_adapter(adapter_name).parse_path(statement_path)
 
@@ -222,6 +216,11 @@ def parse_ecb_reference_rates_xml(xml_payload: str) -> tuple[str, Dict[str, floa
 
 def fetch_ecb_reference_rates() -> tuple[str, Dict[str, float]]:
     """Download and parse the latest ECB reference FX rates."""
+    # Imported here rather than at module top: `urllib.request` drags in
+    # `http.client` and the `email` package, a sizeable slice of CLI start-up
+    # that only `rb fx update` ever needs.
+    import urllib.request
+
     request = urllib.request.Request(
         ECB_DAILY_RATES_URL,
         headers={"User-Agent": FX_HTTP_USER_AGENT},
@@ -280,8 +279,11 @@ def print_summary_table(total_value: float, rows: List[Dict[str, float]]) -> Non
         f"{'Target £':>14}"
         f"{'Delta £':>14}"
     )
-    print(header)
-    print("-" * len(header))
+    rule = "-" * len(header)
+    # Each row is already a single f-string (adjacent literals are joined at
+    # compile time); collect the rendered lines and emit the table with one
+    # write instead of a `print` call per row.
+    lines = [header, rule]
     for row in rows:
         label = row["label"]
         risk = row["risk_weight_raw"]
@@ -292,7 +294,7 @@ def print_summary_table(total_value: float, rows: List[Dict[str, float]]) -> Non
         actual_value = row["actual_value"]
         target_value = row["target_value"]
         delta = actual_value - target_value
-        print(
+        lines.append(
             f"{label:55}"
             f"{risk:10.3f}"
             f"{norm:10.3f}"
@@ -303,8 +305,9 @@ def print_summary_table(total_value: float, rows: List[Dict[str, float]]) -> Non
             f"{target_value:14,.2f}"
             f"{delta:14,.2f}"
         )
-    print("-" * len(header))
-    print(f"{'Total Portfolio Value:':>110} {total_value:14,.2f}")
+    lines.append(rule)
+    lines.append(f"{'Total Portfolio Value:':>110} {total_value:14,.2f}")
+    print("\n".join(lines))
 
 
 def print_source_breakdown(total_value: float, rows: List[tuple[str, float]]) -> None:
@@ -317,9 +320,23 @@ def print_source_breakdown(total_value: float, rows: List[tuple[str, float]]) ->
     print(f"{'Total':40}{total_value:18,.2f}")
 
 
+def _open_csv_for_write(path: Path) -> TextIO:
+    """Open `path` for CSV writing, creating its parent directory if missing.
+
+    The open is tried first: the output directory (usually the user's
+    `reports/`) almost always exists already, and an unconditional
+    `mkdir(exist_ok=True)` would cost a failed `mkdir` plus a `stat` on
+    every export just to find that out.
+    """
+    try:
+        return path.open("w", encoding="utf-8", newline="")
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.open("w", encoding="utf-8", newline="")
+
+
 def export_summary_to_csv(path: Path, rows: List[Dict[str, float]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as handle:
+    with _open_csv_for_write(path) as handle:
         writer = csv.writer(handle)
         writer.writerow(
             [
@@ -334,20 +351,22 @@ def export_summary_to_csv(path: Path, rows: List[Dict[str, float]]) -> None:
                 "DeltaGBP",
             ]
         )
-        for row in rows:
-            writer.writerow(
-                [
-                    row["label"],
-                    row["risk_weight_raw"],
-                    row["risk_weight_normalized"],
-                    row["adjustment"],
-                    row["volatility"],
-                    row["cash_weight"],
-                    row["actual_value"],
-                    row["target_value"],
-                    row["actual_value"] - row["target_value"],
-                ]
+        # One `writerows` call saves a `writerow` method call per row; the
+        # generator below still builds each row in Python.
+        writer.writerows(
+            (
+                row["label"],
+                row["risk_weight_raw"],
+                row["risk_weight_normalized"],
+                row["adjustment"],
+                row["volatility"],
+                row["cash_weight"],
+                row["actual_value"],
+                row["target_value"],
+                row["actual_value"] - row["target_value"],
             )
+            for row in rows
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -460,7 +479,7 @@ def cmd_fx_update(args: argparse.Namespace, paths: Optional[UserPaths] = None) -
             f"{', '.join(sorted(gbp_rates))}"
         )
         return 0
-    except (urllib.error.URLError, OSError) as exc:
+    except OSError as exc:  # includes `urllib.error.URLError`
         print(f"Failed to update FX rates: {exc}", file=sys.stderr)
         return 1
     finally:
@@ -631,46 +650,55 @@ def cmd_portfolio_import(args: argparse.Namespace, paths: Optional[UserPaths] =
     """
     paths = paths if paths is not None else _paths_from_args(args)
 
+    # Resolved once: `resolve()` walks the path with a syscall per
+    # component, and both the filing step and the "was it moved?" check
+    # below need the absolute form.
+    statement = Path(args.statement).resolve()
     canonical_statement = _autofile_statement(
-        Path(args.statement),
+        statement,
         paths,
         adapter=args.adapter,
         account=args.account,
         move=bool(getattr(args, "move", False)),
     )
-    if canonical_statement != Path(args.statement).resolve():
+    if canonical_statement != statement:
         action = "Moved" if getattr(args, "move", False) else "Copied"
         print(f"{action} statement to {canonical_statement}")
 
+    # Parsed in full before the database is opened: a malformed row must
+    # fail here, not after user/account rows have been written.
     parsed = parse_statement(canonical_statement, args.adapter)
     as_of = (args.as_of or _today_iso()).strip()
 
-    db = _open_database(paths)
+    # Store the canonical statement path relative to the project root
+    # so the row is portable across machines.
     try:
-        user_id = repositories.find_or_create_user(db.connection, paths.user)
-        source_id = repositories.get_source_id(db.connection, args.adapter)
-        account_id = repositories.find_or_create_account(
-            db.connection,
-            user_id=user_id,
-            source_id=source_id,
-            name=args.account,
-        )
-
-        # Store the canonical statement path relative to the project root
-        # so the row is portable across machines.
-        try:
-            rel_statement = str(canonical_statement.relative_to(paths.root.resolve()))
-        except ValueError:
-            rel_statement = str(canonical_statement)
+        rel_statement = str(canonical_statement.relative_to(paths.root.resolve()))
+    except ValueError:
+        rel_statement = str(canonical_statement)
 
+    db = _open_database(paths)
+    try:
         db.connection.execute("BEGIN")
         try:
+            user_id = repositories.find_or_create_user(db.connection, paths.user)
+            source_id = repositories.get_source_id(db.connection, args.adapter)
+            account_id = repositories.find_or_create_account(
+                db.connection,
+                user_id=user_id,
+                source_id=source_id,
+                name=args.account,
+            )
             statement_import_id = repositories.replace_statement_import(
                 db.connection,
                 account_id=account_id,
                 as_of=as_of,
                 statement_path=rel_statement,
             )
+            # Instruments resolve one at a time (a new ticker needs its id
+            # before its position can reference it); the positions then go
+            # in with a single `executemany`.
+            positions = []
             for inv in parsed:
                 instrument_id = repositories.find_or_create_instrument(
                     db.connection,
@@ -678,14 +706,12 @@ def cmd_portfolio_import(args: argparse.Namespace, paths: Optional[UserPaths] =
                     instrument_id_text=inv.instrument_id,
                     description=inv.description,
                 )
-                repositories.insert_position(
-                    db.connection,
-                    statement_import_id=statement_import_id,
-                    instrument_id=instrument_id,
-                    description=inv.description,
-                    market_value_native=inv.market_value,
-                    currency=inv.currency,
-                )
+                positions.append((instrument_id, inv.description, inv.market_value, inv.currency))
+            imported_count = repositories.insert_positions(
+                db.connection,
+                statement_import_id=statement_import_id,
+                positions=positions,
+            )
             db.connection.execute("COMMIT")
         except Exception:
             db.connection.execute("ROLLBACK")
@@ -723,19 +749,19 @@ def cmd_portfolio_import(args: argparse.Namespace, paths: Optional[UserPaths] =
                         "unmapped (`rb mapping add` to finish later)."
                     )
 
-        # Recount after the prompts in case the loop added mappings.
-        remaining_unmapped = repositories.list_unmapped_instrument_ids(
-            db.connection, user_id=user_id
-        )
+        # Every "mapped" answer maps exactly one of the instruments listed
+        # above, so the remaining count follows from the first scan rather
+        # than re-running the unmapped-instrument query after the prompts.
+        remaining_unmapped = len(unmapped) - mapped_count
         summary = (
-            f"Imported {len(parsed)} position(s) from {canonical_statement} into "
+            f"Imported {imported_count} position(s) from {canonical_statement} into "
             f"({args.adapter}/{args.account}) as-of {as_of}."
         )
         if mapped_count or skipped_count:
             summary += f" Categorised {mapped_count}; deferred {skipped_count}."
         if remaining_unmapped:
             summary += (
-                f" {len(remaining_unmapped)} instrument(s) still uncategorised — "
+                f" {remaining_unmapped} instrument(s) still uncategorised — "
                 "add mappings with `rb mapping add`."
             )
         print(summary)
@@ -748,8 +774,8 @@ def cmd_portfolio_report(args: argparse.Namespace, paths: Optional[UserPaths] =
     """`rb portfolio report` — aggregate current positions against the plan.
 
     Reads positions from the `current_position` view (latest import per
-    account), resolves each holding's mapping to the user's plan-leaf via
-    `repositories.resolve_category_to_plan_leaf`, converts to GBP using the
+    account), resolves each holding's mappings to the user's plan-leaves via
+    `repositories.plan_leaf_allocations_for_user`, converts to GBP using the
     most recent `fx_rate` row at or before the import's `as_of`, and renders
     a summary table.
     """
@@ -770,88 +796,91 @@ def cmd_portfolio_report(args: argparse.Namespace, paths: Optional[UserPaths] =
             default_leaf_volatility=DEFAULT_LEAF_VOLATILITY,
         )
 
+        # Resolve one GBP rate per distinct (currency, as_of) pair before
+        # touching any position: a missing rate aborts the report before any
+        # aggregation work, and the per-position loop below becomes a single
+        # dict lookup rather than a cache probe plus an occasional FX query.
+        fx_rates: Dict[tuple[str, str], float] = {}
+        for currency, as_of in repositories.currency_dates_in_current_positions(
+            db.connection, user_id=user_id
+        ):
+            rate = repositories.latest_fx_rate_on_or_before(
+                db.connection, as_of=as_of, currency=currency
+            )
+            if rate is None:
+                print(
+                    f"Missing FX rate for {currency} on or before {as_of}; run `rb fx update`.",
+                    file=sys.stderr,
+                )
+                return 1
+            fx_rates[(currency, as_of)] = rate
+
         # Aggregate GBP value per plan-leaf node id.
         totals_by_plan_node: Dict[int, float] = defaultdict(float)
         # Track per-source GBP value for the secondary breakdown table.
         source_totals: Dict[str, float] = defaultdict(float)
-        # Cache FX rates by (currency, as_of) to avoid repeated lookups.
-        fx_cache: Dict[tuple[str, str], float] = {}
         uncategorised_value = 0.0
         uncategorised_tickers: set[str] = set()
+        total_positions = 0
+
+        # Resolve every held instrument's mappings to plan-leaves up front in
+        # one query; the loop below then only does dict lookups.
+        allocations_by_instrument = repositories.plan_leaf_allocations_for_user(
+            db.connection, user_id=user_id
+        )
 
         for position in repositories.iter_current_positions(db.connection, user_id=user_id):
-            currency = position["currency"]
-            as_of = position["as_of"]
-            cache_key = (currency, as_of)
-            if cache_key in fx_cache:
-                rate = fx_cache[cache_key]
-            else:
-                resolved = repositories.latest_fx_rate_on_or_before(
-                    db.connection, as_of=as_of, currency=currency
-                )
-                if resolved is None:
-                    print(
-                        f"Missing FX rate for {currency} on or before {as_of}; run `rb fx update`.",
-                        file=sys.stderr,
-                    )
-                    return 1
-                rate = resolved
-                fx_cache[cache_key] = rate
+            total_positions += 1
+            rate = fx_rates[(position["currency"], position["as_of"])]
             gbp_value = position["market_value_native"] * rate
 
             source_label = f"{position['adapter']}/{position['account_name']}"
             source_totals[source_label] += gbp_value
 
-            mappings = repositories.get_mappings_for_instrument(
-                db.connection, position["instrument_id"]
-            )
-            if not mappings:
+            allocations = allocations_by_instrument.get(position["instrument_id"])
+            if not allocations:
                 uncategorised_value += gbp_value
                 uncategorised_tickers.add(position["instrument_id_text"])
                 continue
-            for category_id, weight_micros in mappings:
-                weight_fraction = weight_micros / MICROS_SCALE
-                share = gbp_value * weight_fraction
-                plan_node_id = repositories.resolve_category_to_plan_leaf(
-                    db.connection, user_id=user_id, category_id=category_id
-                )
+            for plan_node_id, weight_micros in allocations:
+                share = gbp_value * (weight_micros / MICROS_SCALE)
                 if plan_node_id is None:
                     uncategorised_value += share
                     uncategorised_tickers.add(position["instrument_id_text"])
                     continue
                 totals_by_plan_node[plan_node_id] += share
 
-        # Materialise plan-leaves into rows the printer expects.
-        leaf_info_by_path: Dict[str, dict] = {}
-        for plan_node_id, gbp in totals_by_plan_node.items():
-            info = repositories.get_plan_leaf_for_node(db.connection, plan_node_id=plan_node_id)
-            info["actual_value"] = gbp
-            leaf_info_by_path[info["path"]] = info
+        # Re-key the per-leaf totals by category label in one comprehension,
+        # using a single query for every leaf path instead of one lookup
+        # per plan node.
+        leaf_paths = repositories.plan_leaf_paths(db.connection, user_id=user_id)
+        actual_by_path = {
+            leaf_paths[plan_node_id]: gbp for plan_node_id, gbp in totals_by_plan_node.items()
+        }
 
         total_value = sum(totals_by_plan_node.values()) + uncategorised_value
 
-        # Compute risk / cash weights using plan targets.
-        normalized_weights: Dict[str, float] = {}
-        risk_over_vol: Dict[str, float] = {}
-        for target in plan:
-            path = target.path.label()
-            normalized_weights[path] = target.target_weight
-            risk_over_vol[path] = target.target_weight / target.volatility
-        cash_weight_denominator = sum(risk_over_vol.values()) or 1.0
+        # Compute risk / cash weights using plan targets. One pass renders
+        # each label and its risk-over-vol ratio; the second only needs the
+        # ratio total, so no per-label dicts are built or probed.
+        weighted_targets = [
+            (target, target.path.label(), target.target_weight / target.volatility)
+            for target in plan
+        ]
+        cash_weight_denominator = sum(ratio for _, _, ratio in weighted_targets) or 1.0
 
         summary_rows: List[Dict[str, float]] = []
-        for target in plan:
-            path = target.path.label()
-            actual_value = leaf_info_by_path.get(path, {}).get("actual_value", 0.0)
+        for target, path, ratio in weighted_targets:
+            actual_value = actual_by_path.get(path, 0.0)
             actual_weight = (actual_value / total_value) if total_value else 0.0
-            cash_weight = risk_over_vol[path] / cash_weight_denominator
+            cash_weight = ratio / cash_weight_denominator
             target_value = cash_weight * total_value
             summary_rows.append(
                 {
                     "path": path,
                     "label": path,
                     "risk_weight_raw": target.risk_weight,
-                    "risk_weight_normalized": normalized_weights[path],
+                    "risk_weight_normalized": target.target_weight,
                     "adjustment": getattr(target, "adjustment", 1.0),
                     "volatility": target.volatility,
                     "cash_weight": cash_weight,
@@ -862,9 +891,6 @@ def cmd_portfolio_report(args: argparse.Namespace, paths: Optional[UserPaths] =
                 }
             )
 
-        total_positions = sum(
-            1 for _ in repositories.iter_current_positions(db.connection, user_id=user_id)
-        )
         print(f"Loaded {total_positions} position(s) for user '{paths.user}'")
         if uncategorised_tickers:
             print(
@@ -1049,9 +1075,7 @@ def cmd_plan_adjust(args: argparse.Namespace, paths: Optional[UserPaths] = None)
         io: IO = StdIO()
 
         if path_label is not None:
-            parts = tuple(
-                part.strip() for part in path_label.replace(">", "/").split("/") if part.strip()
-            )
+            parts = parse_category_label(path_label.replace(">", "/"))
             assert value is not None
             try:
                 change = apply_targeted(nodes, parts, float(value))
@@ -1154,8 +1178,7 @@ def cmd_plan_export(args: argparse.Namespace, paths: Optional[UserPaths] = None)
     if out_path is None:
         write_plan_csv(nodes, sys.stdout)
         return 0
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8", newline="") as handle:
+    with _open_csv_for_write(out_path) as handle:
         write_plan_csv(nodes, handle)
     print(f"Wrote plan CSV to {out_path}")
     return 0
@@ -1165,12 +1188,17 @@ def cmd_plan_import(args: argparse.Namespace, paths: Optional[UserPaths] = None)
     """`rb plan import` — replace the user's plan from a depth-column CSV."""
     paths = paths if paths is not None else _paths_from_args(args)
     csv_path = Path(args.csv_path)
-    if not csv_path.exists():
+    # Opening is the existence check: one syscall instead of a `stat()`
+    # followed by the `open()`, and no window for the file to vanish
+    # between the two.
+    try:
+        handle = csv_path.open("r", encoding="utf-8", newline="")
+    except FileNotFoundError:
         print(f"CSV file {csv_path} not found", file=sys.stderr)
         return 1
 
     try:
-        with csv_path.open("r", encoding="utf-8", newline="") as handle:
+        with handle:
             new_nodes = read_plan_csv(handle)
     except PlanCSVError as exc:
         print(f"plan import failed: {exc}", file=sys.stderr)
@@ -1303,20 +1331,9 @@ def cmd_user_list(args: argparse.Namespace, paths: Optional[UserPaths] = None) -
     paths = paths if paths is not None else _paths_from_args(args)
     db = _open_database(paths)
     try:
-        names = repositories.list_user_names(db.connection)
-        if names:
-            for name in names:
-                user_id = repositories.find_user_id(db.connection, name)
-                assert user_id is not None
-                leaf_count = db.connection.execute(
-                    """
-                    SELECT COUNT(*) AS n
-                    FROM plan_node pn
-                    LEFT JOIN plan_node child ON child.parent_id = pn.id
-                    WHERE pn.user_id = ? AND child.id IS NULL
-                    """,
-                    (user_id,),
-                ).fetchone()["n"]
+        roster = repositories.list_user_plan_leaf_counts(db.connection)
+        if roster:
+            for name, leaf_count in roster:
                 if leaf_count:
                     print(f"{name:<25} plan_leaves={leaf_count}")
                 else:
@@ -1331,7 +1348,7 @@ def cmd_user_list(args: argparse.Namespace, paths: Optional[UserPaths] = None) -
     # authoritative roster; orphans are likely renames or aborted
     # creates and the user is the only one who knows what to do with
     # them.
-    db_names = set(names)
+    db_names = {name for name, _ in roster}
     orphans: list[str] = []
     if paths.users_root.exists():
         for entry in sorted(paths.users_root.iterdir()):
@@ -1660,8 +1677,9 @@ def _format_category_tree(
         indent = "  " * row["depth"]
         # The full path is unambiguous on its own; the indent is purely
         # visual sugar so a deeper row pops out without forcing the
-        # reader to count " / " separators.
-        leaf_name = row["path"].rsplit(" / ", 1)[-1]
+        # reader to count " / " separators. `rpartition` finds the last
+        # separator in one scan without allocating a list of pieces.
+        leaf_name = row["path"].rpartition(" / ")[2]
         labelled = f"{indent}{leaf_name}"
         vol = f"{row['volatility']:.4f}" if row["volatility"] is not None else "—"
         adj = f"{row['adjustment']:.4f}" if row["adjustment"] is not None else "—"
@@ -10,8 +10,6 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Mapping, Optional, Sequence, TypedDict, Union
 
-import yaml
-
 from .models import CategoryPath, CategoryTarget
 from .portfolio import PortfolioPlan
 
@@ -106,41 +104,48 @@ class CategoryNode:
             children=children,
         )
 
-    def collect_leaf_data(
-        self,
-        *,
-        prefix: Sequence[str] = (),
-        parent_weight: float = 1.0,
-        default_leaf_volatility: float = 0.15,
-        inherited_volatility: Optional[float] = None,
-        accumulator: List[LeafData],
-    ) -> None:
-        path = tuple(prefix) + (self.name,)
-        absolute_weight = parent_weight * self.weight
-        current_volatility = self.volatility or inherited_volatility
-        if self.children:
-            for child in self.children:
-                child.collect_leaf_data(
-                    prefix=path,
-                    parent_weight=absolute_weight,
-                    default_leaf_volatility=default_leaf_volatility,
-                    inherited_volatility=current_volatility,
-                    accumulator=accumulator,
-                )
-        else:
-            volatility = current_volatility or default_leaf_volatility
-            if volatility <= 0:
-                raise ValueError(f"Leaf category {self.name} needs a positive volatility")
-            risk_weight = absolute_weight * self.adjustment
-            accumulator.append(
-                {
-                    "path": path,
-                    "weight": absolute_weight,
-                    "risk_weight": risk_weight,
-                    "volatility": volatility,
-                    "adjustment": self.adjustment,
-                }
+
+def _collect_leaf_data(
+    nodes: Sequence[CategoryNode],
+    *,
+    default_leaf_volatility: float,
+) -> List[LeafData]:
+    """Flatten `nodes` into one `LeafData` entry per leaf, in plan order.
+
+    Walks the tree with an explicit stack rather than recursing, so there
+    is no Python frame (and keyword-argument packing) per node. Each stack
+    entry carries what the node inherits from its ancestors: the path so
+    far, the absolute weight of its parent, and the nearest ancestor
+    volatility. Children are pushed in reverse so they pop in order.
+    """
+    leaves: List[LeafData] = []
+    stack: List[tuple[CategoryNode, tuple[str, ...], float, Optional[float]]] = [
+        (node, (), 1.0, None) for node in reversed(nodes)
+    ]
+    while stack:
+        node, prefix, parent_weight, inherited_volatility = stack.pop()
+        path = (*prefix, node.name)
+        absolute_weight = parent_weight * node.weight
+        current_volatility = node.volatility or inherited_volatility
+        if node.children:
+            stack.extend(
+                (child, path, absolute_weight, current_volatility)
+                for child in reversed(node.children)
             )
+            continue
+        volatility = current_volatility or default_leaf_volatility
+        if volatility <= 0:
+            raise ValueError(f"Leaf category {node.name} needs a positive volatility")
+        leaves.append(
+            {
+                "path": path,
+                "weight": absolute_weight,
+                "risk_weight": absolute_weight * node.adjustment,
+                "volatility": volatility,
+                "adjustment": node.adjustment,
+            }
+        )
+    return leaves
 
 
 def _format_category_location(path: Sequence[str]) -> str:
@@ -211,21 +216,13 @@ def build_portfolio_plan_from_nodes(
     if failures:
         raise ValueError(format_category_weight_validation_failures(failures))
 
-    leaf_data: List[LeafData] = []
-    for node in nodes:
-        node.collect_leaf_data(
-            prefix=(),
-            parent_weight=1.0,
-            default_leaf_volatility=default_leaf_volatility,
-            inherited_volatility=None,
-            accumulator=leaf_data,
-        )
+    leaf_data = _collect_leaf_data(nodes, default_leaf_volatility=default_leaf_volatility)
     risk_total = sum(item["risk_weight"] for item in leaf_data)
     if risk_total <= 0:
         raise ValueError("Total risk weight must be positive")
     category_targets = [
         CategoryTarget(
-            path=CategoryPath(item["path"]),
+            path=CategoryPath.from_iterable(item["path"]),
             normalized_risk_weight=item["risk_weight"] / risk_total,
             volatility=item["volatility"],
             risk_weight=item["risk_weight"],
@@ -238,8 +235,21 @@ def build_portfolio_plan_from_nodes(
 
 def load_category_nodes_from_yaml(path: Union[str, Path]) -> list[CategoryNode]:
     """Load hierarchical category nodes from a YAML file."""
-    with open(path, "r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
+    # PyYAML is imported on first use: the CLI itself never reads YAML (the
+    # plan lives in the database) and only tests reach this loader, directly
+    # or via `load_portfolio_plan_from_yaml`, so every command would
+    # otherwise pay its import cost for nothing.
+    import yaml
+
+    # libyaml's C-accelerated loader parses several times faster than the
+    # pure-Python `SafeLoader` and is just as safe (no arbitrary object
+    # construction). PyYAML wheels normally ship it; fall back to the
+    # pure-Python loader when the build lacks libyaml.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    # Hand the loader raw bytes: libyaml detects the UTF-8/UTF-16 encoding
+    # and decodes in C, instead of going through a Python text wrapper.
+    with open(path, "rb") as handle:
+        data = yaml.load(handle, Loader=loader)
     if not data:
         raise ValueError("Category configuration YAML is empty")
     assets_data = data.get("assets", data)
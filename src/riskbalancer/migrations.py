@@ -16,8 +16,8 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import sqlite3
+import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from typing import Callable, List
 
 # Each migration applies one numbered change. The list order is the schema
@@ -1207,7 +1207,7 @@ def _utc_now_iso() -> str:
 
     Stored in `schema_version.applied_at`. The CHECK constraint on that
     column requires the `Z` suffix, so we explicitly canonicalise the
-    output (Python's default appends `+00:00`).
+    output (Python's default appends `+00:00`). `time.gmtime()` is already
+    whole-second UTC, so no `datetime` round trip is needed.
     """
-    now = datetime.now(timezone.utc).replace(microsecond=0)
-    return now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
@@ -6,24 +6,65 @@ Author: Emre Tezel
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, Tuple, Union
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+# A separator plus any whitespace around it, so one split both cuts the
+# label into segments and trims their inner edges.
+_LABEL_SEPARATOR = re.compile(r"\s*/\s*")
+
+
+@lru_cache(maxsize=4096)
+def parse_category_label(label: str) -> Tuple[str, ...]:
+    """Split a `/`-separated category label into trimmed, non-empty parts.
+
+    The one place user input and stored `category_path.path` strings are
+    turned into path segments, so the splitting rules (whitespace around
+    separators, stray empty segments) cannot drift between the CLI, the
+    repositories and the plan helpers. The label is stripped once and
+    split on `_LABEL_SEPARATOR`, which leaves every segment already
+    trimmed, so only the empty ones need filtering out.
+
+    Memoised: the same handful of catalogue paths is split over and over
+    (every catalogue load, every plan lookup), and the result is an
+    immutable tuple, so sharing it between callers is safe.
+    """
+    return tuple(filter(None, _LABEL_SEPARATOR.split(label.strip())))
+
+
+@lru_cache(maxsize=4096)
+def normalize_category_label(label: str) -> str:
+    """Return `label` in the canonical ` / `-joined form (empty if no parts)."""
+    return " / ".join(parse_category_label(label))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CategoryPath:
     """Represents a hierarchical category path of arbitrary depth."""
 
     parts: Tuple[str, ...]
+    # The ` / `-joined form, rendered once at construction: the report and
+    # the plan tooling ask for it per leaf, and the path is immutable.
+    _label: str = field(init=False, repr=False, compare=False)
 
-    def __init__(self, *parts: Union[str, Iterable[str]]):
-        if len(parts) == 1 and isinstance(parts[0], Iterable) and not isinstance(parts[0], str):
-            normalized = tuple(str(part).strip() for part in parts[0] if str(part).strip())
-        else:
-            normalized = tuple(str(part).strip() for part in parts if str(part).strip())
+    def __init__(self, *parts: str):
+        normalized = tuple(stripped for stripped in (part.strip() for part in parts) if stripped)
         if not normalized:
             raise ValueError("CategoryPath requires at least one level")
         object.__setattr__(self, "parts", normalized)
+        object.__setattr__(self, "_label", " / ".join(normalized))
+
+    @classmethod
+    def from_iterable(cls, parts: Iterable[str]) -> CategoryPath:
+        """Build a path from an existing sequence of levels.
+
+        `build_portfolio_plan_from_nodes` builds every plan path this way
+        from the levels it collects; `CategoryPath(*parts)` takes the
+        levels as separate arguments.
+        """
+        return cls(*parts)
 
     def __len__(self) -> int:
         return len(self.parts)
@@ -54,10 +95,10 @@ class CategoryPath:
 
     def label(self) -> str:
         """Human readable path."""
-        return " / ".join(self.parts)
+        return self._label
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CategoryTarget:
     """Desired target risk allocation for a fully qualified category."""
 
@@ -88,13 +129,20 @@ class CategoryTarget:
         return self.normalized_risk_weight
 
 
-@dataclass
+@dataclass(slots=True)
 class Investment:
     """Normalized view of a single line item coming from a broker statement.
 
     `market_value` is in the position's native `currency` — no FX conversion
     happens at parse time. The database stores the native amount; GBP
     equivalents are derived at report time by joining `fx_rate`.
+
+    Adapters build one of these per statement row, so the class uses
+    `__slots__` to drop the per-instance `__dict__` (smaller objects,
+    faster attribute access). It is deliberately not frozen: a frozen
+    dataclass routes every field assignment in `__init__` through
+    `object.__setattr__`, which makes construction slower, and
+    `__post_init__` rewrites `currency` in place.
     """
 
     instrument_id: str
@@ -112,7 +160,7 @@ class Investment:
         self.currency = normalised
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CategoryStatus:
     """Summary for a sub-category vs target/cash weight."""
 
@@ -27,6 +27,7 @@ from pathlib import Path
 from typing import Iterable, Iterator, Optional, Sequence
 
 from .configuration import CategoryNode
+from .models import normalize_category_label
 
 # `_ask` and `_prompt_yes_no` are private helpers in `plan_bootstrap`, but
 # they are the canonical abort-aware prompt primitives used by every
@@ -75,14 +76,12 @@ def normalize_under(raw: str) -> str:
     """Normalise an `--under` argument into the canonical separator form.
 
     Accepts both `>` (the doc/help-text convention used in user-facing
-    examples) and `/` (what `_normalize_label` and `_parse_category_label`
-    in `cli.py` consume). The result is whitespace-trimmed, joined with
-    ` / `, and lower-cased so a single prefix match handles both
-    spellings.
+    examples) and `/` (what `models.normalize_category_label` and
+    `models.parse_category_label` consume). The result is
+    whitespace-trimmed, joined with ` / `, and lower-cased so a single
+    prefix match handles both spellings.
     """
-    canonical = raw.replace(">", "/")
-    parts = [part.strip() for part in canonical.split("/") if part.strip()]
-    return " / ".join(parts).lower()
+    return normalize_category_label(raw.replace(">", "/")).lower()
 
 
 def iter_leaf_nodes(
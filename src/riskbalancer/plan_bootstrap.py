@@ -25,6 +25,7 @@ from .configuration import (
     collect_category_weight_validation_failures,
     format_category_weight_validation_failures,
 )
+from .models import parse_category_label
 from .repositories import MICROS_SCALE
 
 DEFAULT_ADJUSTMENT = 1.0
@@ -135,7 +136,7 @@ def _merge_seed_leaves_into_catalog(
         """
     ).fetchall()
     for row in rows:
-        path = tuple(part.strip() for part in str(row["path"]).split("/") if part.strip())
+        path = parse_category_label(str(row["path"]))
         if not path:
             continue
         vol = row["volatility_micros"] / MICROS_SCALE
@@ -418,8 +419,7 @@ def _prompt_pick_one(
     category happens to be named "new", typing `new` will pick it; the
     sentinel is reachable as `+ new` in that case.
     """
-    labels = [_decorate_label(node) for node in remaining]
-    labels.append(NEW_CATEGORY_SENTINEL)
+    options = ", ".join([*(_decorate_label(node) for node in remaining), NEW_CATEGORY_SENTINEL])
     name_to_node = {node.name.lower(): node for node in remaining}
     # Sibling names guard the "+ new" sub-flow so a synthetic node can't
     # collide with another sibling — already-picked or still-available.
@@ -429,12 +429,13 @@ def _prompt_pick_one(
         if picked
         else "none yet"
     )
+    # Nothing shown in the prompt changes while the user retries, so it is
+    # rendered once rather than re-joined after every unknown answer.
+    prompt = (
+        f"Select an asset class to add to {level_label} [{options}] (assigned so far: {progress}): "
+    )
     while True:
-        raw = _ask(
-            io,
-            f"Select an asset class to add to {level_label} "
-            f"[{', '.join(labels)}] (assigned so far: {progress}): ",
-        )
+        raw = _ask(io, prompt)
         cleaned = raw.strip().lower()
         if cleaned in name_to_node:
             return name_to_node[cleaned]
@@ -190,9 +190,13 @@ def _format_number(value: float) -> str:
 # ---------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _ParsedRow:
-    """Intermediate shape held while building the tree. Not part of the API."""
+    """Intermediate shape held while building the tree. Not part of the API.
+
+    One is built per CSV row, so `__slots__` keeps each instance free of a
+    per-object `__dict__`.
+    """
 
     path: tuple[str, ...]
     weights: tuple[float, ...]
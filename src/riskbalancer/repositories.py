@@ -20,10 +20,11 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import sqlite3
-from datetime import UTC, datetime
+import time
 from typing import Iterable, Iterator, Optional, Sequence
 
 from .configuration import CategoryNode
+from .models import normalize_category_label, parse_category_label
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -59,13 +60,18 @@ def amount_to_decithou(value: float) -> int:
     return round(value * DECITHOU_SCALE)
 
 
+_UTC_ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
 def _utc_now_iso() -> str:
     """Return the current UTC time as `YYYY-MM-DDTHH:MM:SSZ`.
 
     Centralised so every `created_at` / `imported_at` row uses the same
-    formatting that the CHECK constraints expect.
+    formatting that the CHECK constraints expect. Formats a `time.gmtime()`
+    struct directly: whole-second resolution with no `datetime` object,
+    `replace(microsecond=0)` copy or timezone arithmetic per call.
     """
-    return datetime.now(UTC).replace(microsecond=0).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return time.strftime(_UTC_ISO_FORMAT, time.gmtime())
 
 
 # ---------------------------------------------------------------------------
@@ -121,6 +127,27 @@ def list_user_names(connection: sqlite3.Connection) -> list[str]:
     return [row["name"] for row in rows]
 
 
+def list_user_plan_leaf_counts(connection: sqlite3.Connection) -> list[tuple[str, int]]:
+    """Return `(user name, plan-leaf count)` for every user, alphabetically.
+
+    A count of zero means the user has no plan yet. One grouped query
+    covers the whole roster, so `rb user list` does not issue an id
+    lookup and a count per user.
+    """
+    rows = connection.execute(
+        """
+        SELECT u.name AS name, COUNT(pn.id) AS leaf_count
+        FROM user u
+        LEFT JOIN plan_node pn
+            ON pn.user_id = u.id
+           AND NOT EXISTS (SELECT 1 FROM plan_node child WHERE child.parent_id = pn.id)
+        GROUP BY u.id
+        ORDER BY u.name
+        """
+    ).fetchall()
+    return [(str(row["name"]), int(row["leaf_count"])) for row in rows]
+
+
 # ---------------------------------------------------------------------------
 # Categories
 # ---------------------------------------------------------------------------
@@ -419,7 +446,9 @@ def load_plan_tree(
             pn.parent_id,
             pn.category_id,
             pn.weight_micros,
-            c.name AS name
+            c.name AS name,
+            c.volatility_micros,
+            c.adjustment_micros
         FROM plan_node pn
         JOIN category c ON c.id = pn.category_id
         WHERE pn.user_id = ?
@@ -429,7 +458,7 @@ def load_plan_tree(
     ).fetchall()
     by_id: dict[int, CategoryNode] = {}
     parent_of: dict[int, Optional[int]] = {}
-    category_of: dict[int, int] = {}
+    row_of: dict[int, sqlite3.Row] = {}
     for row in rows:
         node = CategoryNode(
             name=str(row["name"]),
@@ -440,7 +469,7 @@ def load_plan_tree(
         node_id = int(row["id"])
         by_id[node_id] = node
         parent_of[node_id] = int(row["parent_id"]) if row["parent_id"] is not None else None
-        category_of[node_id] = int(row["category_id"])
+        row_of[node_id] = row
     roots: list[CategoryNode] = []
     for node_id, node in by_id.items():
         parent = parent_of[node_id]
@@ -449,22 +478,23 @@ def load_plan_tree(
         else:
             by_id[parent].children.append(node)
     # Populate vol/adj on plan-leaves only. A node is a leaf iff it has
-    # no plan children. The paired-NULL CHECK on `category` guarantees
-    # both columns are set together, so a hit yields a complete pair; a
-    # miss (NULL) is a data-integrity error and surfaces as a typed
-    # exception.
+    # no plan children. The columns come from the same query as the tree
+    # itself rather than one `get_category_attribute` call per leaf. The
+    # paired-NULL CHECK on `category` guarantees both columns are set
+    # together, so a hit yields a complete pair; a miss (NULL) is a
+    # data-integrity error and surfaces as a typed exception.
     for node_id, node in by_id.items():
         if node.children:
             continue
-        category_id = category_of[node_id]
-        attr = get_category_attribute(connection, category_id)
-        if attr is None:
+        row = row_of[node_id]
+        if row["volatility_micros"] is None:
             raise ValueError(
-                f"Plan-leaf {node.name!r} (category_id={category_id}) has no "
+                f"Plan-leaf {node.name!r} (category_id={row['category_id']}) has no "
                 "volatility/adjustment recorded; vol/adj must be set "
                 "explicitly before the plan can be loaded."
             )
-        node.volatility, node.adjustment = attr
+        node.volatility = row["volatility_micros"] / MICROS_SCALE
+        node.adjustment = row["adjustment_micros"] / MICROS_SCALE
     return roots
 
 
@@ -683,7 +713,7 @@ def iter_mapping_paths(
         """
     ).fetchall()
     for row in rows:
-        parts = tuple(part.strip() for part in str(row["path"]).split("/") if part.strip())
+        parts = parse_category_label(str(row["path"]))
         if parts:
             yield parts
 
@@ -748,7 +778,7 @@ def find_category_by_path(
     CRUD commands that must error cleanly when the user names a path
     that doesn't exist yet.
     """
-    cleaned = " / ".join(part.strip() for part in path.split("/") if part.strip())
+    cleaned = normalize_category_label(path)
     if not cleaned:
         return None
     row = connection.execute(
@@ -889,7 +919,7 @@ def list_mappings(
         where.append("i.instrument_id_text = ?")
         params.append(instrument_id_text.strip())
     if category_path is not None:
-        cleaned = " / ".join(part.strip() for part in category_path.split("/") if part.strip())
+        cleaned = normalize_category_label(category_path)
         where.append("cp.path = ?")
         params.append(cleaned)
     where_sql = f"WHERE {' AND '.join(where)}" if where else ""
@@ -971,6 +1001,73 @@ def resolve_category_to_plan_leaf(
     return int(row["plan_node_id"])
 
 
+def plan_leaf_allocations_for_user(
+    connection: sqlite3.Connection,
+    *,
+    user_id: int,
+) -> dict[int, list[tuple[Optional[int], int]]]:
+    """Return `{instrument_id: [(plan_node_id or None, weight_micros), …]}`.
+
+    Covers every instrument the user currently holds that has at least
+    one mapping; an instrument missing from the result has no mapping at
+    all. Within an instrument, rows come back in mapping insertion order.
+    A `None` plan-node id means that mapping has no plan-leaf ancestor for
+    this user (uncategorised).
+
+    This is the bulk form of `resolve_category_to_plan_leaf`: the
+    recursive walk runs once per *distinct* mapped category rather than
+    once per mapping row, and the whole portfolio resolves in a single
+    round trip instead of a query per position.
+    """
+    rows = connection.execute(
+        """
+        WITH RECURSIVE
+        held_mapping AS (
+            SELECT m.id, m.instrument_id, m.category_id, m.weight_micros
+            FROM mapping m
+            WHERE m.instrument_id IN (
+                SELECT instrument_id FROM current_position WHERE user_id = ?
+            )
+        ),
+        ancestors(category_id, id, depth) AS (
+            SELECT DISTINCT category_id, category_id, 0 FROM held_mapping
+            UNION ALL
+            SELECT a.category_id, c.parent_id, a.depth + 1
+            FROM ancestors a
+            JOIN category c ON c.id = a.id
+            WHERE c.parent_id IS NOT NULL
+        ),
+        plan_leaf_hits AS (
+            SELECT
+                a.category_id AS category_id,
+                pn.id AS plan_node_id,
+                ROW_NUMBER() OVER (PARTITION BY a.category_id ORDER BY a.depth) AS rank
+            FROM ancestors a
+            JOIN plan_node pn ON pn.category_id = a.id AND pn.user_id = ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM plan_node child
+                WHERE child.user_id = ? AND child.parent_id = pn.id
+            )
+        )
+        SELECT
+            hm.instrument_id AS instrument_id,
+            hm.weight_micros AS weight_micros,
+            h.plan_node_id AS plan_node_id
+        FROM held_mapping hm
+        LEFT JOIN plan_leaf_hits h ON h.category_id = hm.category_id AND h.rank = 1
+        ORDER BY hm.instrument_id, hm.id
+        """,
+        (user_id, user_id, user_id),
+    ).fetchall()
+    allocations: dict[int, list[tuple[Optional[int], int]]] = {}
+    for row in rows:
+        plan_node_id = int(row["plan_node_id"]) if row["plan_node_id"] is not None else None
+        allocations.setdefault(int(row["instrument_id"]), []).append(
+            (plan_node_id, int(row["weight_micros"]))
+        )
+    return allocations
+
+
 # ---------------------------------------------------------------------------
 # Instruments
 # ---------------------------------------------------------------------------
@@ -1287,42 +1384,44 @@ def replace_statement_import(
 # ---------------------------------------------------------------------------
 
 
-def insert_position(
+def insert_positions(
     connection: sqlite3.Connection,
     *,
     statement_import_id: int,
-    instrument_id: int,
-    description: Optional[str],
-    market_value_native: float,
-    currency: str,
-) -> None:
-    """Insert one `position` row.
+    positions: Iterable[tuple[int, Optional[str], float, str]],
+) -> int:
+    """Insert one `position` row per `(instrument_id, description,
+    market_value_native, currency)` tuple and return how many were written.
 
     Native amount, no GBP conversion. The schema's `UNIQUE
     (statement_import_id, instrument_id)` means one row per instrument per
     import — split allocations are computed at mapping-resolution time, not
     duplicated here.
+
+    Each row is normalised (blank descriptions to NULL, amounts to
+    `decithou`, currency upper-cased) and the whole statement is written
+    with a single `executemany`.
     """
-    if description is not None:
-        description = description.strip() or None
-    decithou = amount_to_decithou(market_value_native)
-    if decithou < 0:
-        raise ValueError("market value must be non-negative (long-only model)")
-    connection.execute(
+
+    def _rows() -> Iterator[tuple[int, int, Optional[str], int, str]]:
+        for instrument_id, description, market_value_native, currency in positions:
+            if description is not None:
+                description = description.strip() or None
+            decithou = amount_to_decithou(market_value_native)
+            if decithou < 0:
+                raise ValueError("market value must be non-negative (long-only model)")
+            yield (statement_import_id, instrument_id, description, decithou, currency.upper())
+
+    cursor = connection.executemany(
         """
         INSERT INTO position
           (statement_import_id, instrument_id, description,
            market_value_native_decithou, currency)
         VALUES (?, ?, ?, ?, ?)
         """,
-        (
-            statement_import_id,
-            instrument_id,
-            description,
-            decithou,
-            currency.upper(),
-        ),
+        _rows(),
     )
+    return cursor.rowcount
 
 
 def iter_current_positions(
@@ -1512,43 +1611,32 @@ def get_instrument_by_id(
     )
 
 
-def get_plan_leaf_for_node(
+def plan_leaf_paths(
     connection: sqlite3.Connection,
     *,
-    plan_node_id: int,
-) -> dict:
-    """Return summary info for a plan-leaf node id.
-
-    Returns `{"category_id", "path", "volatility", "adjustment"}` — the
-    fields the report needs to aggregate by leaf and compute risk-parity
-    weights. Raises if the node has children (i.e. isn't a leaf) or if
-    fundamentals are missing on the leaf's category.
+    user_id: int,
+) -> dict[int, str]:
+    """Return `{plan_node_id: category path}` for every leaf of the user's plan.
+
+    One query for the whole plan, so the report can label its per-leaf
+    totals without a lookup per plan node. Volatility / adjustment are not
+    returned: the report reads them from the `PortfolioPlan` built by
+    `load_plan_tree`, which already fails loudly on a leaf without them.
     """
-    row = connection.execute(
+    rows = connection.execute(
         """
-        SELECT pn.category_id AS category_id,
-               cp.path AS path,
-               c.volatility_micros AS vol_micros,
-               c.adjustment_micros AS adj_micros
+        SELECT pn.id AS plan_node_id, cp.path AS path
         FROM plan_node pn
-        JOIN category c ON c.id = pn.category_id
         JOIN category_path cp ON cp.id = pn.category_id
-        WHERE pn.id = ?
+        WHERE pn.user_id = ?
+          AND NOT EXISTS (
+              SELECT 1 FROM plan_node child
+              WHERE child.user_id = ? AND child.parent_id = pn.id
+          )
         """,
-        (plan_node_id,),
-    ).fetchone()
-    if row is None:
-        raise ValueError(f"plan_node {plan_node_id} not found")
-    if row["vol_micros"] is None:
-        raise ValueError(
-            f"plan-leaf at {row['path']!r} is missing volatility/adjustment fundamentals"
-        )
-    return {
-        "category_id": int(row["category_id"]),
-        "path": str(row["path"]),
-        "volatility": float(row["vol_micros"]) / MICROS_SCALE,
-        "adjustment": float(row["adj_micros"]) / MICROS_SCALE,
-    }
+        (user_id, user_id),
+    ).fetchall()
+    return {int(row["plan_node_id"]): str(row["path"]) for row in rows}
 
 
 def currencies_in_current_positions(
@@ -1567,3 +1655,26 @@ def currencies_in_current_positions(
         (user_id,),
     ).fetchall()
     return [str(row["currency"]) for row in rows]
+
+
+def currency_dates_in_current_positions(
+    connection: sqlite3.Connection,
+    *,
+    user_id: int,
+) -> list[tuple[str, str]]:
+    """Return the distinct `(currency, as_of)` pairs the user currently holds.
+
+    The report resolves one GBP rate per pair up front so the per-position
+    loop is a plain dict lookup instead of an FX query (or cache probe)
+    per holding.
+    """
+    rows = connection.execute(
+        """
+        SELECT DISTINCT currency, as_of
+        FROM current_position
+        WHERE user_id = ?
+        ORDER BY currency, as_of
+        """,
+        (user_id,),
+    ).fetchall()
+    return [(str(row["currency"]), str(row["as_of"])) for row in rows]
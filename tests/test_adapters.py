@@ -5,8 +5,11 @@ Adapters now return native amounts and currencies — FX conversion to GBP
 happens at report time using the `fx_rate` table, not in the adapter.
 """
 
+import io
 from pathlib import Path
 
+import pytest
+
 from riskbalancer.adapters import (
     AegonCSVAdapter,
     AJBellCSVAdapter,
@@ -14,6 +17,7 @@ from riskbalancer.adapters import (
     IBKRCSVAdapter,
     MS401KCSVAdapter,
     SchwabCSVAdapter,
+    StatementAdapter,
 )
 
 FIXTURES = Path(__file__).parent / "fixtures"
@@ -45,6 +49,26 @@ def test_ibkr_adapter_emits_native_currency():
     assert by_id["PLTR"].market_value == 10500.0
 
 
+def test_ibkr_adapter_skips_other_sections_before_splitting():
+    """Other sections, including quoted multi-line fields, never leak in."""
+    section = "Positions and Mark-to-Market Profit and Loss"
+    tail = ",0,0,0,0,0,100,0,0,0,0,0"
+    statement = io.StringIO(
+        "Statement,Header,Field Name,Field Value\n"
+        f'Notes,Data,"line one\n{section},Data,Summary,Stocks,USD,FAKE,FAKE{tail}\n"\n'
+        f"{section},Data,Summary,Stocks,USD,EARLY,NO HEADER YET{tail}\n"
+        f"{section},Header,DataDiscriminator\n"
+        f'"{section}",Data,Summary,Stocks,USD,VWRL,"VANGUARD, ALL-WORLD"{tail}\n'
+        "Trades,Header,DataDiscriminator\n"
+        f"{section},Data,Summary,Stocks,USD,LATE,AFTER OTHER SECTION{tail}\n"
+    )
+    investments = IBKRCSVAdapter().parse_file(statement)
+    assert [(inv.instrument_id, inv.description) for inv in investments] == [
+        ("VWRL", "VANGUARD, ALL-WORLD")
+    ]
+    assert investments[0].market_value == 100.0
+
+
 def test_ms401k_adapter_emits_usd():
     adapter = MS401KCSVAdapter()
     investments = adapter.parse_path(FIXTURES / "ms401k_sample.csv")
@@ -98,3 +122,51 @@ def test_aegon_adapter_parses_and_skips_total():
         inv for inv in investments if inv.instrument_id == "BRSP Default Strategy 2046-2048"
     )
     assert brsp.market_value == 10000.00
+
+
+def test_parse_amount_strips_symbols_and_separators():
+    """Every adapter shares one money parser; blanks read as zero."""
+    assert StatementAdapter._parse_amount("$1,234.50") == 1234.5
+    assert StatementAdapter._parse_amount(" Â£17,717.24 ") == 17717.24
+    assert StatementAdapter._parse_amount("-42") == -42.0
+    assert StatementAdapter._parse_amount("") == 0.0
+    assert StatementAdapter._parse_amount(None) == 0.0
+
+
+def test_aj_bell_adapter_matches_value_header_case_insensitively():
+    """The value column is resolved once from the header, ignoring case."""
+    handle = io.StringIO('Investment,Ticker,VALUE (£)\nAcme Equity,ACME,"1,250.00"\n')
+    investments = AJBellCSVAdapter().parse_file(handle)
+    assert [(inv.instrument_id, inv.market_value) for inv in investments] == [("ACME", 1250.0)]
+
+
+def test_adapter_headers_other_than_aj_bell_value_match_exactly():
+    """Only AJ Bell's value aliases ignore case; every other column must match exactly."""
+    aj_bell = io.StringIO("investment,Ticker,Value (£)\nAcme Equity,ACME,100.00\n")
+    assert AJBellCSVAdapter().parse_file(aj_bell) == []
+    citi = io.StringIO("Security ID,Description,MARKET VALUE\nAAPL,Apple,100.00\n")
+    assert CitiCSVAdapter().parse_file(citi) == []
+
+
+@pytest.mark.parametrize(
+    ("adapter", "fixture"),
+    [
+        (AJBellCSVAdapter(), "aj_bell_sample.csv"),
+        (AegonCSVAdapter(), "aegon_sample.csv"),
+        (CitiCSVAdapter(), "citi_sample.csv"),
+        (IBKRCSVAdapter(), "ibkr_sample.csv"),
+        (MS401KCSVAdapter(), "ms401k_sample.csv"),
+        (SchwabCSVAdapter(), "schwab_sample.csv"),
+    ],
+)
+def test_adapters_honour_max_rows(adapter, fixture):
+    """`max_rows` returns the leading investments of a full parse."""
+    full = adapter.parse_path(FIXTURES / fixture)
+    assert adapter.parse_path(FIXTURES / fixture, max_rows=1) == full[:1]
+
+
+def test_max_rows_stops_before_later_rows_are_parsed():
+    """Rows past the cap are never converted, so a bad trailing row is harmless."""
+    handle = io.StringIO("Investment,Ticker,Value (£)\nAcme Equity,ACME,100\nBroken,BRK,n/a\n")
+    investments = AJBellCSVAdapter().parse_file(handle, max_rows=1)
+    assert [inv.instrument_id for inv in investments] == ["ACME"]
@@ -11,12 +11,16 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import argparse
+import os
 import sqlite3
+import subprocess
+import sys
+import urllib.error
 from pathlib import Path
 
 import pytest
 
-from conftest import sandboxed_paths
+from conftest import SRC, sandboxed_paths
 from riskbalancer.cli import (
     cmd_fx_update,
     derive_gbp_fx_rates,
@@ -214,6 +218,36 @@ def _patch_ecb(monkeypatch, xml_payload: str = SAMPLE_ECB_XML) -> None:
     monkeypatch.setattr("riskbalancer.cli.fetch_ecb_reference_rates", fake_fetch)
 
 
+def test_fx_update_reports_network_failure(tmp_path: Path, monkeypatch, capsys) -> None:
+    paths = sandboxed_paths(tmp_path)
+
+    def failing_fetch() -> tuple[str, dict[str, float]]:
+        raise urllib.error.URLError("no route to host")
+
+    monkeypatch.setattr("riskbalancer.cli.fetch_ecb_reference_rates", failing_fetch)
+
+    rc = cmd_fx_update(_fx_args(currencies=["USD"]), paths=paths)
+    assert rc == 1
+    assert "Failed to update FX rates" in capsys.readouterr().err
+
+
+def test_cli_import_defers_http_modules() -> None:
+    """Only `rb fx update` needs `urllib.request`, so importing the CLI skips it."""
+    probe = (
+        "import sys, riskbalancer.cli; "
+        "print(sorted(m for m in ('urllib.request', 'http.client') if m in sys.modules))"
+    )
+    # The child does not inherit conftest's `sys.path` tweak, so hand it `src/`.
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    assert result.stdout.strip() == "[]"
+
+
 def test_fx_update_writes_rates_to_db(tmp_path: Path, monkeypatch, capsys) -> None:
     paths = sandboxed_paths(tmp_path)
     _patch_ecb(monkeypatch)
@@ -12,6 +12,7 @@ Author: Emre Tezel
 from __future__ import annotations
 
 import argparse
+import sqlite3
 from pathlib import Path
 
 import pytest
@@ -115,6 +116,7 @@ def test_import_non_interactive_defers_unmapped(paths, capsys) -> None:
     )
     assert rc == 0
     out = capsys.readouterr().out
+    assert "Imported 1 position(s)" in out
     assert "1 instrument(s) still uncategorised" in out
 
     db = Database.connect(paths.db_path)
@@ -129,6 +131,72 @@ def test_import_non_interactive_defers_unmapped(paths, capsys) -> None:
         db.close()
 
 
+def test_import_parses_statement_before_any_db_write(paths, tmp_path) -> None:
+    """A malformed statement fails in parsing, before any row is written."""
+    bob = sandboxed_paths(tmp_path, user="bob")
+    bad = bob.user_dir / "bad.csv"
+    bad.parent.mkdir(parents=True, exist_ok=True)
+    bad.write_text(
+        "Investment,Ticker,Value (£)\nAcme Equity,ACME,not-a-number\n",
+        encoding="utf-8",
+    )
+    bad_args = _import_args(bob, statement=bad, non_interactive=True)
+    bad_args.account = "typo-acct"
+    with pytest.raises(ValueError):
+        cmd_portfolio_import(bad_args, paths=bob)
+
+    db = Database.connect(paths.db_path)
+    try:
+        users = db.connection.execute("SELECT name FROM user").fetchall()
+        assert [row[0] for row in users] == ["alice"]
+        assert db.connection.execute("SELECT COUNT(*) FROM account").fetchone()[0] == 0
+    finally:
+        db.close()
+
+    statement = _write_statement(paths, instrument_text="ACME", value=1000.0)
+    args = _import_args(paths, statement=statement, non_interactive=True)
+    assert cmd_portfolio_import(args, paths=paths) == 0
+
+    statement.write_text(
+        "Investment,Ticker,Value (£)\nAcme Equity,ACME,500.00\nBroken,BRK,-1.00\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        cmd_portfolio_import(args, paths=paths)
+
+    db = Database.connect(paths.db_path)
+    try:
+        rows = db.connection.execute("SELECT market_value_native_decithou FROM position").fetchall()
+        assert [row[0] for row in rows] == [10_000_000]
+    finally:
+        db.close()
+
+
+def test_import_db_failure_rolls_back_user_account_and_import(paths, tmp_path) -> None:
+    """A failure inside the transaction leaves no new user/account/import rows."""
+    bob = sandboxed_paths(tmp_path, user="bob")
+    # The same ticker twice parses fine but breaks the
+    # `UNIQUE(statement_import_id, instrument_id)` constraint on insert.
+    dup = bob.user_dir / "dup.csv"
+    dup.parent.mkdir(parents=True, exist_ok=True)
+    dup.write_text(
+        "Investment,Ticker,Value (£)\nAcme Equity,ACME,100.00\nAcme Equity,ACME,200.00\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(sqlite3.IntegrityError):
+        cmd_portfolio_import(_import_args(bob, statement=dup, non_interactive=True), paths=bob)
+
+    db = Database.connect(paths.db_path)
+    try:
+        users = db.connection.execute("SELECT name FROM user").fetchall()
+        assert [row[0] for row in users] == ["alice"]
+        for table in ("account", "statement_import", "instrument", "position"):
+            count = db.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            assert count == 0, table
+    finally:
+        db.close()
+
+
 def test_import_no_unmapped_means_no_prompt_and_no_warning(paths, capsys, monkeypatch) -> None:
     """If every imported instrument is already mapped, the prompt never fires."""
     statement = _write_statement(paths, instrument_text="ACME")
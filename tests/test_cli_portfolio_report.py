@@ -0,0 +1,264 @@
+"""
+Tests for `rb portfolio report`.
+
+The report reads the user's current positions from the DB, converts them
+to GBP through the `fx_rate` table, rolls each mapping up to the user's
+plan-leaf, and prints the summary / per-source tables (optionally
+exporting the summary to CSV).
+
+Author: Emre Tezel
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+from pathlib import Path
+
+import pytest
+
+from conftest import populate_test_catalog, sandboxed_paths, write_plan_yaml_to_db
+from riskbalancer.cli import cmd_portfolio_import, cmd_portfolio_report
+from riskbalancer.db import Database
+from riskbalancer.repositories import (
+    add_mapping,
+    find_category_by_path,
+    find_instrument_by_natural_key,
+    find_user_id,
+    get_mappings_for_instrument,
+    get_source_id,
+    load_plan_tree,
+    plan_leaf_allocations_for_user,
+    resolve_category_to_plan_leaf,
+    upsert_fx_rate,
+)
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+PLAN_YAML = """\
+assets:
+  - name: Equities
+    weight: 0.6
+    volatility: 0.18
+    adjustment: 1.0
+  - name: Bonds
+    weight: 0.4
+    volatility: 0.05
+    adjustment: 1.0
+"""
+
+AS_OF = "2026-05-17"
+
+
+def _import(paths, *, adapter: str, account: str, body: str) -> None:
+    """Write `body` as a statement and import it non-interactively."""
+    statement = paths.user_dir / f"{adapter}-{account}.csv"
+    statement.parent.mkdir(parents=True, exist_ok=True)
+    statement.write_text(body, encoding="utf-8")
+    args = argparse.Namespace(
+        user=paths.user,
+        adapter=adapter,
+        account=account,
+        statement=str(statement),
+        as_of=AS_OF,
+        move=False,
+        non_interactive=True,
+    )
+    assert cmd_portfolio_import(args, paths=paths) == 0
+
+
+def _map(paths, *, adapter: str, instrument: str, splits: list[tuple[str, int]]) -> None:
+    """Map `instrument` onto `(category_path, weight_micros)` splits."""
+    db = Database.connect(paths.db_path)
+    try:
+        source_id = get_source_id(db.connection, adapter)
+        instrument_id = find_instrument_by_natural_key(
+            db.connection, source_id=source_id, instrument_id_text=instrument
+        )
+        assert instrument_id is not None
+        db.connection.execute("BEGIN")
+        for category_path, weight_micros in splits:
+            category_id = find_category_by_path(db.connection, category_path)
+            assert category_id is not None, category_path
+            add_mapping(
+                db.connection,
+                instrument_id=instrument_id,
+                category_id=category_id,
+                weight_micros=weight_micros,
+            )
+        db.connection.execute("COMMIT")
+    finally:
+        db.close()
+
+
+@pytest.fixture()
+def paths(tmp_path: Path):
+    """A user with a two-leaf plan and GBP + USD holdings imported."""
+    p = sandboxed_paths(tmp_path, user="alice")
+    populate_test_catalog(p)
+    write_plan_yaml_to_db(p, PLAN_YAML)
+    _import(
+        p,
+        adapter="ajbell",
+        account="isa",
+        body=(
+            "Investment,Ticker,Value (£)\n"
+            "Acme Equity,ACME,1000.00\n"
+            "Balanced Fund,BAL,500.00\n"
+            "Mystery Co,MYST,250.00\n"
+        ),
+    )
+    _import(
+        p,
+        adapter="ms401k",
+        account="401k",
+        body='"Plan","Fund Name","Closing Balance"\n"401(k) Plan","Bond Fund","$1,000.00"\n',
+    )
+    # ACME rolls up from `Equities / Developed / NAM` to the plan leaf
+    # `Equities`; BAL splits 60/40; MYST stays unmapped.
+    _map(p, adapter="ajbell", instrument="ACME", splits=[("Equities / Developed / NAM", 1_000_000)])
+    _map(
+        p,
+        adapter="ajbell",
+        instrument="BAL",
+        splits=[("Equities / EM / Asia", 600_000), ("Bonds / Developed / UK", 400_000)],
+    )
+    _map(
+        p, adapter="ms401k", instrument="Bond_Fund", splits=[("Bonds / Developed / NAM", 1_000_000)]
+    )
+    return p
+
+
+def _set_usd_rate(paths, rate: float) -> None:
+    db = Database.connect(paths.db_path)
+    try:
+        upsert_fx_rate(db.connection, rate_date="2026-05-15", currency="USD", gbp_rate=rate)
+        db.connection.commit()
+    finally:
+        db.close()
+
+
+def _report_args(paths, *, export: str | None = None) -> argparse.Namespace:
+    return argparse.Namespace(user=paths.user, export=export)
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+
+def test_report_converts_and_rolls_up_to_plan_leaves(paths, tmp_path, capsys) -> None:
+    """Native values convert at the latest rate and land on the plan leaves."""
+    _set_usd_rate(paths, 0.8)
+    export = tmp_path / "out" / "summary.csv"
+
+    rc = cmd_portfolio_report(_report_args(paths, export=str(export)), paths=paths)
+    assert rc == 0
+
+    out = capsys.readouterr().out
+    assert "Loaded 4 position(s) for user 'alice'" in out
+    assert "1 instrument(s) uncategorised (£250.00): MYST" in out
+    table_lines = out.splitlines()
+    equities_line = next(line for line in table_lines if line.startswith("Equities "))
+    assert equities_line.split()[-3] == "1,300.00"
+    assert any(
+        line.startswith(" ") and line.split()[-1] == "2,550.00"
+        for line in table_lines
+        if "Total Portfolio Value:" in line
+    )
+
+    with export.open(encoding="utf-8") as handle:
+        rows = {row["Category"]: row for row in csv.DictReader(handle)}
+    # Equities = ACME 1000 + 60% of BAL 500; Bonds = 40% of BAL + $1000 * 0.8.
+    assert float(rows["Equities"]["ActualValueGBP"]) == pytest.approx(1300.0)
+    assert float(rows["Bonds"]["ActualValueGBP"]) == pytest.approx(1000.0)
+    # Cash weights are risk weight / volatility, normalised: 0.6/0.18 vs 0.4/0.05.
+    equities_ratio, bonds_ratio = 0.6 / 0.18, 0.4 / 0.05
+    expected_equities = equities_ratio / (equities_ratio + bonds_ratio)
+    assert float(rows["Equities"]["CashWeight"]) == pytest.approx(expected_equities)
+    assert float(rows["Bonds"]["CashWeight"]) == pytest.approx(1 - expected_equities)
+    # Targets apply cash weights to the whole portfolio, uncategorised included.
+    assert float(rows["Equities"]["TargetValueGBP"]) == pytest.approx(expected_equities * 2550.0)
+
+
+def test_report_fails_when_fx_rate_missing(paths, capsys) -> None:
+    """A held currency with no rate on or before `as_of` aborts the report."""
+    rc = cmd_portfolio_report(_report_args(paths), paths=paths)
+    assert rc == 1
+    assert f"Missing FX rate for USD on or before {AS_OF}" in capsys.readouterr().err
+
+
+# ---------------------------------------------------------------------------
+# repositories: plan_leaf_allocations_for_user
+# ---------------------------------------------------------------------------
+
+
+def test_plan_leaf_allocations_match_per_mapping_resolver(paths) -> None:
+    """The bulk query agrees with resolving each mapping separately."""
+    _map(paths, adapter="ajbell", instrument="MYST", splits=[("Cash / GBP", 1_000_000)])
+    db = Database.connect(paths.db_path)
+    try:
+        user_id = find_user_id(db.connection, paths.user)
+        assert user_id is not None
+        allocations = plan_leaf_allocations_for_user(db.connection, user_id=user_id)
+
+        instrument_ids = []
+        for adapter, text in (
+            ("ajbell", "ACME"),
+            ("ajbell", "BAL"),
+            ("ajbell", "MYST"),
+            ("ms401k", "Bond_Fund"),
+        ):
+            instrument_id = find_instrument_by_natural_key(
+                db.connection,
+                source_id=get_source_id(db.connection, adapter),
+                instrument_id_text=text,
+            )
+            assert instrument_id is not None
+            instrument_ids.append(instrument_id)
+            expected = [
+                (
+                    resolve_category_to_plan_leaf(
+                        db.connection, user_id=user_id, category_id=category_id
+                    ),
+                    weight_micros,
+                )
+                for category_id, weight_micros in get_mappings_for_instrument(
+                    db.connection, instrument_id
+                )
+            ]
+            assert allocations[instrument_id] == expected
+        assert sorted(allocations) == sorted(instrument_ids)
+        # `Cash / GBP` has no plan-leaf ancestor in the two-leaf plan.
+        assert allocations[instrument_ids[2]] == [(None, 1_000_000)]
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# repositories: load_plan_tree
+# ---------------------------------------------------------------------------
+
+
+def test_load_plan_tree_reads_leaf_fundamentals_in_the_tree_query(paths) -> None:
+    """Leaf vol/adj come back with the tree; a NULL pair is a typed error."""
+    db = Database.connect(paths.db_path)
+    try:
+        user_id = find_user_id(db.connection, paths.user)
+        assert user_id is not None
+        leaves = {node.name: node for node in load_plan_tree(db.connection, user_id)}
+        assert (leaves["Equities"].volatility, leaves["Equities"].adjustment) == (0.18, 1.0)
+        assert (leaves["Bonds"].volatility, leaves["Bonds"].adjustment) == (0.05, 1.0)
+
+        bonds_id = find_category_by_path(db.connection, "Bonds")
+        db.connection.execute(
+            "UPDATE category SET volatility_micros = NULL, adjustment_micros = NULL WHERE id = ?",
+            (bonds_id,),
+        )
+        with pytest.raises(ValueError, match="Plan-leaf 'Bonds'"):
+            load_plan_tree(db.connection, user_id)
+    finally:
+        db.close()
@@ -1,7 +1,12 @@
 import math
+import os
+import subprocess
+import sys
 
 import pytest
 
+from conftest import SRC
+
 from riskbalancer.configuration import (
     collect_category_weight_validation_failures,
     format_category_weight_validation_failures,
@@ -103,3 +108,57 @@ assets:
     assert weights["AssetB / Leaf2"].risk_weight == pytest.approx(0.5, rel=1e-6)
     assert math.isclose(weights["AssetA / Leaf1"].target_weight, 2 / 3, rel_tol=1e-6)
     assert math.isclose(weights["AssetB / Leaf2"].target_weight, 1 / 3, rel_tol=1e-6)
+
+
+def test_load_category_nodes_from_yaml_decodes_bom_and_non_ascii_names(tmp_path):
+    config = tmp_path / "plan.yaml"
+    config.write_text(
+        "\ufeffassets:\n  - name: Épargne\n    weight: 1.0\n    volatility: 0.1\n",
+        encoding="utf-8",
+    )
+    nodes = load_category_nodes_from_yaml(config)
+    assert [node.name for node in nodes] == ["Épargne"]
+
+
+def test_cli_import_does_not_load_pyyaml():
+    """PyYAML is imported lazily by the YAML loader, never at CLI start-up."""
+    probe = "import sys, riskbalancer.cli; print('yaml' in sys.modules)"
+    # The child does not inherit conftest's `sys.path` tweak, so hand it `src/`.
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_plan_targets_keep_plan_order_and_inherit_volatility(tmp_path):
+    config = tmp_path / "nested.yaml"
+    config.write_text(
+        """
+assets:
+  - name: Equities
+    weight: 0.6
+    volatility: 0.2
+    children:
+      - name: Developed
+        weight: 0.5
+        children:
+          - name: UK
+            weight: 1.0
+      - name: EM
+        weight: 0.5
+        volatility: 0.3
+  - name: Bonds
+    weight: 0.4
+""",
+        encoding="utf-8",
+    )
+    plan = load_portfolio_plan_from_yaml(config)
+    assert [(t.path.label(), t.volatility) for t in plan] == [
+        ("Equities / Developed / UK", 0.2),
+        ("Equities / EM", 0.3),
+        ("Bonds", 0.15),
+    ]
@@ -0,0 +1,42 @@
+"""
+Tests for the core model helpers in `riskbalancer.models`.
+
+Author: Emre Tezel
+"""
+
+import pytest
+
+from riskbalancer.models import CategoryPath, normalize_category_label, parse_category_label
+
+
+def test_parse_category_label_trims_and_drops_empty_segments():
+    assert parse_category_label(" Equities /EM/ / Asia ") == ("Equities", "EM", "Asia")
+    assert parse_category_label("Equities") == ("Equities",)
+    assert parse_category_label(" / ") == ()
+
+
+def test_normalize_category_label_uses_canonical_separator():
+    assert normalize_category_label("Equities/EM /Asia") == "Equities / EM / Asia"
+    assert normalize_category_label("") == ""
+
+
+def test_label_helpers_reuse_cached_results():
+    label = "Bonds/ Developed /UK"
+    assert parse_category_label(label) is parse_category_label(label)
+    assert normalize_category_label(label) is normalize_category_label(label)
+
+
+def test_category_path_constructors_agree():
+    assert CategoryPath(" Equities ", "", "EM").parts == ("Equities", "EM")
+    assert CategoryPath.from_iterable(["Equities", " EM "]) == CategoryPath("Equities", "EM")
+    with pytest.raises(ValueError):
+        CategoryPath.from_iterable([" "])
+
+
+def test_category_path_label_is_rendered_once_and_ignored_by_equality():
+    path = CategoryPath("Equities", "EM")
+    assert path.label() == "Equities / EM"
+    assert path.label() is path.label()
+    assert path == CategoryPath.from_iterable(["Equities", "EM"])
+    assert hash(path) == hash(CategoryPath("Equities", "EM"))
+    assert "_label" not in repr(path)